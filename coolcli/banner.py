@@ -2,10 +2,12 @@ from rich.console import Console
 from rich.text import Text
 import pyfiglet
 
-def print_banner(console: Console):
+def print_banner(console: Console, gradient: bool = True):
     """
     Print a gradient SAXOFLOW banner using only solid block characters (█).
     Creates clean, solid letters with cyan to white gradient left to right.
+    With ``gradient=False`` the banner is printed in a single style, which
+    avoids emitting a colour escape sequence for every glyph.
     """
     # Define gradient colors: cyan to white (left to right)
     start_rgb = (0, 255, 255)    # Cyan
@@ -13,6 +15,10 @@ def print_banner(console: Console):
     
     # Create SAXOFLOW using solid block characters
     saxoflow_art = create_solid_saxoflow()
+
+    if not gradient:
+        console.print(Text("\n".join(saxoflow_art), style="bold cyan"))
+        return
     
     gradient_text = Text()
     
@@ -0,0 +1,419 @@
+"""
+Pooled, rate-limited HTTP client for model backends.
+
+:class:`BackendClient` keeps a pool of persistent HTTP/1.1 connections per
+endpoint so turns do not pay for a new TCP/TLS handshake each time. A
+client-side token bucket keeps the request rate within the provider's
+limits, failed requests are retried with jittered exponential backoff, and
+identical requests that are already in flight are merged into a single
+upstream call. Pool and queue metrics are exposed for ``/perf``.
+"""
+
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# HTTP statuses worth retrying: rate limited or a transient server failure.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Errors worth retrying: the request could not be delivered or answered.
+CONNECTION_ERRORS = (http.client.HTTPException, ConnectionError, OSError)
+# Errors raised by a keep-alive connection the server has already closed.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class BackendError(Exception):
+    """Raised when a backend request fails after all retries."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    """A fully read HTTP response."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body.decode("utf-8"))
+
+
+class TokenBucket:
+    """
+    Client-side rate limiter.
+
+    Tokens are added at ``rate`` per second up to ``burst``; each request
+    takes one. A ``rate`` of zero disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.throttled = 0
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available. Returns the time waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        with self._lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        if waited:
+                            self.throttled += 1
+                        return waited
+                    delay = (1 - self._tokens) / self.rate
+                time.sleep(delay)
+                waited += delay
+        finally:
+            with self._lock:
+                self.waiting -= 1
+
+
+class ConnectionPool:
+    """A bounded pool of keep-alive connections to a single host."""
+
+    def __init__(self, scheme: str, host: str, port: Optional[int], size: int = 4, timeout: float = 60.0):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.waiting = 0
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def acquire(self, timeout: Optional[float] = None) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Return a connection and whether it was reused.
+
+        If the pool is exhausted, waits up to ``timeout`` seconds (the
+        pool's own timeout by default) for one to be released and raises
+        :class:`BackendError` if none is.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self.waiting += 1
+            try:
+                while not self._idle and self._in_use >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise BackendError(f"no connection to {self.host} became free within {timeout:g}s")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self._in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop(), True
+            self.created += 1
+        return self._connect(), False
+
+    def release(self, conn: http.client.HTTPConnection, reusable: bool = True) -> None:
+        """Return ``conn`` to the pool, or close it if it cannot be reused."""
+        with self._cond:
+            self._in_use -= 1
+            if reusable:
+                self._idle.append(conn)
+            else:
+                self.discarded += 1
+            self._cond.notify()
+        if not reusable:
+            conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def metrics(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self.waiting,
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+
+class BackendClient:
+    """
+    HTTP client shared by all model calls to one endpoint.
+
+    Requests go through the token bucket, then borrow a pooled
+    connection. Connection failures and retryable statuses are retried
+    up to ``retries`` times with full-jitter exponential backoff (or the
+    server's ``Retry-After``, unless it asks for more than ``max_backoff``).
+    A request that times out after it was sent is not retried, since the
+    server may still be processing it. When ``coalesce`` is set, a request
+    that is identical to one already in flight waits for and shares its
+    response.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        max_connections: int = 4,
+        rate_limit: float = 0.0,
+        rate_burst: int = 1,
+        retries: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 60.0,
+        coalesce: bool = True,
+    ):
+        parts = urlsplit(endpoint)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"invalid endpoint URL: {endpoint!r}")
+        self.endpoint = endpoint
+        self.base_path = parts.path.rstrip("/")
+        self.host_header = parts.netloc
+        self.pool = ConnectionPool(parts.scheme, parts.hostname, parts.port, max_connections, timeout)
+        self.limiter = TokenBucket(rate_limit, rate_burst)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.coalesce = coalesce
+        self._inflight: Dict[Tuple[str, str, bytes], Future] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.failures = 0
+
+    def request(self, method: str, path: str = "", body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Response:
+        """
+        Send a request, sharing the upstream call with identical in-flight ones.
+
+        ``timeout`` bounds the whole call, including waiting for a pooled
+        connection, retries and backoff; it defaults to the client's.
+        """
+        url = self.base_path + path
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        with self._lock:
+            self.requests += 1
+        if not self.coalesce:
+            return self._send_with_retries(method, url, body, headers, deadline)
+
+        key = (method.upper(), url, body or b"")
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.coalesced += 1
+        if not leader:
+            try:
+                return future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                if future.done():
+                    raise
+                raise BackendError(f"{method} {self.endpoint} timed out waiting for an identical request") from None
+        try:
+            response = self._send_with_retries(method, url, body, headers, deadline)
+            future.set_result(response)
+            return response
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def post_json(self, payload: Dict[str, Any], path: str = "", timeout: Optional[float] = None) -> Any:
+        """POST ``payload`` as JSON and return the decoded JSON response."""
+        body = json.dumps(payload, sort_keys=True).encode("utf-8")
+        response = self.request("POST", path, body, {"Content-Type": "application/json"}, timeout)
+        return response.json()
+
+    def _send_with_retries(self, method: str, url: str, body: Optional[bytes],
+                           headers: Optional[Dict[str, str]], deadline: float) -> Response:
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            retry_after: Optional[float] = None
+            try:
+                response = self._send(method, url, body, headers, deadline)
+            except BackendError:
+                # Timed out; the request may already have been processed
+                with self._lock:
+                    self.failures += 1
+                raise
+            except CONNECTION_ERRORS as exc:
+                error = BackendError(f"{method} {self.endpoint} failed: {exc}")
+            else:
+                if response.status < 400:
+                    return response
+                error = BackendError(
+                    f"{method} {self.endpoint} returned HTTP {response.status}", status=response.status
+                )
+                if response.status not in RETRY_STATUSES:
+                    with self._lock:
+                        self.failures += 1
+                    raise error
+                try:
+                    retry_after = max(0.0, float(response.headers.get("retry-after", "")))
+                except ValueError:
+                    retry_after = None
+                if retry_after is not None and retry_after > self.max_backoff:
+                    with self._lock:
+                        self.failures += 1
+                    raise BackendError(
+                        f"{method} {self.endpoint} returned HTTP {response.status}; "
+                        f"server asked to retry after {retry_after:g}s",
+                        status=response.status,
+                    )
+            cap = min(self.max_backoff, self.backoff * (2 ** (attempt + 1)))
+            delay = retry_after if retry_after is not None else random.uniform(0, cap)
+            if attempt >= self.retries or time.monotonic() + delay >= deadline:
+                with self._lock:
+                    self.failures += 1
+                raise error
+            attempt += 1
+            with self._lock:
+                self.retried += 1
+            time.sleep(delay)
+
+    def _send(self, method: str, url: str, body: Optional[bytes],
+              headers: Optional[Dict[str, str]], deadline: float) -> Response:
+        conn, reused = self.pool.acquire(max(0.0, deadline - time.monotonic()))
+        reusable = False
+        try:
+            with self._lock:
+                self.upstream_calls += 1
+            try:
+                resp, data = self._exchange(conn, method, url, body, headers, deadline)
+            except STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                with self._lock:
+                    self.upstream_calls += 1
+                resp, data = self._exchange(conn, method, url, body, headers, deadline)
+            reusable = not resp.will_close
+            return Response(resp.status, {k.lower(): v for k, v in resp.getheaders()}, data)
+        finally:
+            self.pool.release(conn, reusable)
+
+    def _exchange(self, conn: http.client.HTTPConnection, method: str, url: str, body: Optional[bytes],
+                  headers: Optional[Dict[str, str]], deadline: float) -> Tuple[http.client.HTTPResponse, bytes]:
+        """Send one request on ``conn`` and read the response before ``deadline``."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise BackendError(f"{method} {self.endpoint} timed out")
+        conn.timeout = remaining
+        if conn.sock is None:
+            # Connecting may time out and be retried: nothing has been sent yet
+            conn.connect()
+        else:
+            conn.sock.settimeout(remaining)
+        try:
+            conn.request(method, url or "/", body=body, headers=self._headers(headers))
+            resp = conn.getresponse()
+            return resp, resp.read()
+        except socket.timeout as exc:
+            raise BackendError(f"{method} {self.endpoint} timed out after {remaining:g}s") from exc
+
+    def _headers(self, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+        merged = {"Host": self.host_header, "Connection": "keep-alive"}
+        if headers:
+            merged.update(headers)
+        return merged
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.pool.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return pool, rate limiter and request counters."""
+        metrics: Dict[str, Any] = {
+            "endpoint": self.endpoint,
+            "pool": self.pool.metrics(),
+            "rate_limit": self.limiter.rate,
+            "rate_waiting": self.limiter.waiting,
+            "rate_throttled": self.limiter.throttled,
+        }
+        with self._lock:
+            metrics.update({
+                "requests": self.requests,
+                "upstream_calls": self.upstream_calls,
+                "coalesced": self.coalesced,
+                "inflight": len(self._inflight),
+                "retried": self.retried,
+                "failures": self.failures,
+            })
+        return metrics
+
+
+def client_from_config(config: Dict[str, Any]) -> BackendClient:
+    """Build a client from the shell's generation ``config``."""
+    return BackendClient(
+        config["endpoint"],
+        max_connections=int(config.get("max_connections", 4)),
+        rate_limit=float(config.get("rate_limit", 0.0)),
+        rate_burst=int(config.get("rate_burst", 1)),
+        retries=int(config.get("retries", 3)),
+        timeout=float(config.get("request_timeout", 60.0)),
+    )
+
+
+def http_backend(client: BackendClient, model: str):
+    """
+    Build a ``/compare`` backend that sends requests through ``client``.
+
+    The request dictionary is POSTed as JSON with the model name added;
+    the response is expected to be a JSON object with a ``text`` field.
+    The response is not streamed: it arrives as a single chunk, so the
+    backend is marked ``streams = False`` and ``/compare`` reports no
+    time to first token for it. ``timeout`` overrides the client's
+    request timeout; ``/compare`` passes the time left before the model
+    times out, so an abandoned call releases its pooled connection.
+    """
+    def backend(request: Dict[str, Any], timeout: Optional[float] = None) -> Iterable[str]:
+        data = client.post_json(dict(request, model=model), timeout=timeout)
+        yield data.get("text", "") if isinstance(data, dict) else str(data)
+    backend.streams = False  # type: ignore[attr-defined]
+    backend.accepts_timeout = True  # type: ignore[attr-defined]
+    return backend
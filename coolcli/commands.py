@@ -22,8 +22,8 @@ def handle_command(cmd: str, console):
 
 - **/help** — Show this help
 - **/exit** — Exit the CLI
-- **/simulate** — Run simulation
-- **/synth** — Run synthesis
+- **/simulate [log]** — Run simulation, or summarise an existing Icarus/Verilator log file
+- **/synth [log]** — Run synthesis, or summarise an existing Yosys log file
 - **/ai** — Use AI agent _(coming soon)_
 - **/attach &lt;path&gt;** — Attach a file to the current conversation
 - **/save &lt;file&gt;** — Save your current session to a JSON file
@@ -32,8 +32,11 @@ def handle_command(cmd: str, console):
 - **/stats** — Show approximate token statistics for the current session
 - **/system &lt;prompt&gt;** — Set a persistent system prompt
 - **/clear** — Clear the current conversation and attachments
-- **/models** — List available AI models (placeholder)
-- **/set &lt;parameter&gt;=&lt;value&gt;** — Adjust generation parameters (e.g. temperature)
+- **/models** — List available AI models
+- **/compare &lt;model1,model2|all&gt; &lt;prompt&gt;** — Send one prompt to several models at once and compare them side by side (time to first token is shown only for streaming backends; endpoint models return whole responses)
+- **/set &lt;parameter&gt;=&lt;value&gt;** — Adjust generation and display parameters (e.g. temperature, endpoint, rate_limit, request_timeout, color_depth, low_bandwidth)
+- **/view &lt;turn&gt;** — Page through the full output of a (folded) conversation turn
+- **/perf** — Show terminal output statistics (bytes per frame, bytes saved)
 
 Commands beginning with `/` are parsed by the shell and may modify the
 state of your session (e.g. attachments, system prompts, configuration).
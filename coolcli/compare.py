@@ -0,0 +1,261 @@
+"""
+Concurrent multi-model fan-out for the ``/compare`` command.
+
+A backend is any callable that takes an assembled request dictionary and
+yields the response in chunks as they arrive. Backends are registered by
+model name with :func:`register_backend`; :func:`compare_models` sends the
+same request to several of them at once, bounded by a concurrency limit and
+a per-model timeout, and records latency, time-to-first-token and token
+counts for each. A backend that returns the whole response at once rather
+than streaming it should set a ``streams`` attribute to ``False``; its
+time-to-first-token is then left unset instead of equalling its latency.
+A backend with a true ``accepts_timeout`` attribute is also passed a
+``timeout`` keyword: the seconds left before the model times out.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+Backend = Callable[[Dict[str, Any]], Iterable[str]]
+
+# Number of trailing characters of each response shown while streaming.
+LIVE_TAIL_CHARS = 1500
+
+_backends: Dict[str, Backend] = {}
+
+
+def register_backend(name: str, backend: Backend) -> None:
+    """Make ``backend`` available under the model name ``name``."""
+    _backends[name] = backend
+
+
+def unregister_backend(name: str) -> None:
+    """Remove a previously registered backend, if present."""
+    _backends.pop(name, None)
+
+
+def available_models() -> List[str]:
+    """Return the names of all registered backends."""
+    return list(_backends)
+
+
+def echo_backend(label: str, delay: float = 0.02) -> Backend:
+    """
+    Build a placeholder backend that echoes the prompt word by word.
+
+    Used until real model backends are wired in, and as a local stub
+    when exercising ``/compare``.
+    """
+    def backend(request: Dict[str, Any]) -> Iterable[str]:
+        response = f"I received your message: '{request['prompt']}'. ({label} response placeholder)"
+        if request.get("attachments"):
+            response += "\n\nAttached file(s): " + ", ".join(request["attachments"])
+        if request.get("system_prompt"):
+            response += f"\n\nSystem prompt: {request['system_prompt']}"
+        for word in response.split(" "):
+            time.sleep(delay)
+            yield word + " "
+    return backend
+
+
+register_backend("placeholder-model-1", echo_backend("placeholder-model-1"))
+register_backend("placeholder-model-2", echo_backend("placeholder-model-2", delay=0.04))
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count, consistent with ``/stats``."""
+    return len(text.split())
+
+
+class ModelResult:
+    """Streaming state and final metrics for one model in a comparison."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.status = "queued"
+        self.chunks: List[str] = []
+        self.error: Optional[str] = None
+        self.started: Optional[float] = None
+        self.first_token: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "error", "timeout")
+
+    @property
+    def latency(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def ttft(self) -> Optional[float]:
+        if self.started is None or self.first_token is None:
+            return None
+        return self.first_token - self.started
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serialisable record of the result."""
+        text = self.text
+        return {
+            "model": self.model,
+            "status": self.status,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "ttft": round(self.ttft, 3) if self.ttft is not None else None,
+            "tokens": count_tokens(text),
+            "response": text,
+            "error": self.error,
+        }
+
+
+def _run(backend: Backend, request: Dict[str, Any], result: ModelResult, lock: threading.Lock,
+         timeout: float) -> None:
+    streams = getattr(backend, "streams", True)
+    try:
+        if getattr(backend, "accepts_timeout", False):
+            remaining = max(0.0, result.started + timeout - time.monotonic())
+            chunks = backend(request, timeout=remaining)  # type: ignore[call-arg]
+        else:
+            chunks = backend(request)
+        for chunk in chunks:
+            with lock:
+                if result.done:
+                    # Timed out while waiting for this chunk; drop the rest
+                    return
+                if streams and result.first_token is None:
+                    result.first_token = time.monotonic()
+                result.chunks.append(chunk)
+    except Exception as exc:
+        with lock:
+            if not result.done:
+                result.finished = time.monotonic()
+                if result.finished - result.started >= timeout:
+                    # The backend gave up at the same deadline we enforce
+                    result.status = "timeout"
+                    result.error = f"no complete response within {timeout:g}s"
+                else:
+                    result.status = "error"
+                    result.error = str(exc)
+        return
+    with lock:
+        if not result.done:
+            result.status = "done"
+            result.finished = time.monotonic()
+
+
+def compare_models(
+    models: List[str],
+    request: Dict[str, Any],
+    concurrency: int = 4,
+    timeout: float = 60.0,
+    on_update: Optional[Callable[[List[ModelResult]], None]] = None,
+    interval: float = 0.1,
+    backends: Optional[Dict[str, Backend]] = None,
+) -> List[ModelResult]:
+    """
+    Send ``request`` to every model in ``models`` concurrently.
+
+    At most ``concurrency`` backends run at a time, each on a daemon
+    thread. A model that has not finished ``timeout`` seconds after it
+    started is marked as timed out, its remaining output is discarded and
+    its slot is handed to the next queued model. ``on_update`` is called
+    every ``interval`` seconds with the live results, and once at the end.
+    ``backends`` supplies extra backends for this call only, on top of
+    the registered ones.
+    """
+    backends = dict(_backends, **(backends or {}))
+    unknown = [model for model in models if model not in backends]
+    if unknown:
+        raise KeyError(f"unknown model(s): {', '.join(unknown)}")
+    lock = threading.Lock()
+    results = [ModelResult(model) for model in models]
+    queued = list(results)
+    concurrency = max(1, concurrency)
+    while True:
+        now = time.monotonic()
+        with lock:
+            for result in results:
+                if result.status == "running" and now - result.started > timeout:
+                    result.status = "timeout"
+                    result.error = f"no complete response within {timeout:g}s"
+                    result.finished = now
+            # A timed out backend may still be blocked in its thread, but it
+            # no longer holds a slot; queued models start in its place.
+            running = sum(1 for result in results if result.status == "running")
+            starting = []
+            while queued and running < concurrency:
+                result = queued.pop(0)
+                result.status = "running"
+                result.started = now
+                starting.append(result)
+                running += 1
+            finished = all(result.done for result in results)
+        for result in starting:
+            # Daemon threads, so an abandoned backend cannot block exit
+            threading.Thread(
+                target=_run,
+                args=(backends[result.model], request, result, lock, timeout),
+                name=f"coolcli-compare-{result.model}",
+                daemon=True,
+            ).start()
+        if on_update is not None:
+            on_update(results)
+        if finished:
+            break
+        time.sleep(interval)
+    return results
+
+
+def _stats_line(result: ModelResult) -> str:
+    parts = [result.status]
+    if result.ttft is not None:
+        parts.append(f"ttft {result.ttft:.2f}s")
+    if result.latency is not None:
+        parts.append(f"latency {result.latency:.2f}s")
+    parts.append(f"{count_tokens(result.text)} tokens")
+    return " · ".join(parts)
+
+
+def comparison_table(results: List[ModelResult]) -> Table:
+    """Render the responses side by side, one column per model."""
+    table = Table.grid(expand=True, padding=(0, 1))
+    for _ in results:
+        table.add_column(ratio=1)
+    panels = []
+    for result in results:
+        body = Text(result.text[-LIVE_TAIL_CHARS:])
+        if result.error:
+            body.append(f"\n❌ {result.error}", style="bold red")
+        border = {"done": "green", "error": "red", "timeout": "yellow"}.get(result.status, "violet")
+        panels.append(Panel(
+            body,
+            title=result.model,
+            title_align="left",
+            subtitle=_stats_line(result),
+            subtitle_align="left",
+            border_style=border,
+        ))
+    table.add_row(*panels)
+    return table
+
+
+def comparison_text(results: List[ModelResult]) -> str:
+    """Format the final results as plain text for the conversation history."""
+    sections = []
+    for result in results:
+        header = f"=== {result.model} ({_stats_line(result)}) ==="
+        body = result.text.strip()
+        if result.error:
+            body = f"{body}\n❌ {result.error}".strip()
+        sections.append(f"{header}\n{body}")
+    return "\n\n".join(sections)
@@ -0,0 +1,256 @@
+"""
+Streaming parsers for simulation and synthesis tool output.
+
+Logs produced by Icarus Verilog, Verilator and Yosys can run to many
+thousands of lines. Rather than keeping the raw text around (and pushing it
+through ``ai_panel`` on every redraw), the parsers in this module consume the
+output one line at a time and fold it into a small :class:`LogSummary`. Only
+a bounded number of example messages is retained, so memory stays flat no
+matter how long the log gets.
+"""
+
+import re
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
+
+from rich.table import Table
+from rich.text import Text
+
+# Maximum number of error/warning messages kept verbatim in a summary.
+MAX_MESSAGES = 10
+# Minimum number of seconds between two live summary updates.
+UPDATE_INTERVAL = 0.25
+
+# Icarus: "tb.v:12: error: Unknown module type: foo"
+_IVERILOG_DIAG = re.compile(r"^(?P<loc>\S+:\d+):\s*(?P<kind>error|warning|sorry):\s*(?P<msg>.*)$", re.I)
+# Verilator: "%Error: tb.v:12:3: msg" / "%Warning-WIDTH: tb.v:4:9: msg"
+_VERILATOR_DIAG = re.compile(r"^%(?P<kind>Error|Warning)(?:-[A-Z0-9_]+)?:\s*(?P<msg>.*)$")
+# Verilator's closing tally: "%Error: Exiting due to 2 error(s)"
+_VERILATOR_EXIT = re.compile(r"^%Error:\s*Exiting due to\s+(?P<count>\d+)\s+error")
+# Yosys: "ERROR: msg" / "Warning: msg"
+_YOSYS_DIAG = re.compile(r"^(?P<kind>ERROR|Warning):\s*(?P<msg>.*)$")
+# Yosys `stat` output
+_YOSYS_CELLS = re.compile(r"^\s*Number of cells:\s*(?P<count>\d+)")
+_YOSYS_CELL_TYPE = re.compile(r"^\s+(?P<cell>\$?[\w$\\.]+)\s+(?P<count>\d+)\s*$")
+_YOSYS_AREA = re.compile(r"^\s*Chip area for (?:top )?module\s+'?(?P<module>[^':]*)'?:\s*(?P<area>[-\d.eE+]+)")
+# Static timing: OpenSTA "  -0.12   slack (VIOLATED)" or "slack: 1.23"
+_SLACK = re.compile(r"(?P<value>-?\d+(?:\.\d+)?)\s+slack\b|\bslack\b\s*[:=]?\s*(?P<value2>-?\d+(?:\.\d+)?)", re.I)
+# ABC / `sta` critical path: "Delay = 123.45 ps"
+_DELAY = re.compile(r"\bDelay\s*=\s*(?P<value>\d+(?:\.\d+)?)")
+# Icarus/Verilator end of simulation: "$finish called at 1000 (1s)"
+_FINISH = re.compile(r"\$finish\b.*?at\s+(?P<time>\d+)")
+
+
+class LogSummary:
+    """
+    Structured summary of a tool log built up one line at a time.
+
+    Only counters, a handful of example messages and the synthesis
+    statistics are stored; the raw lines are discarded as soon as they
+    have been parsed.
+    """
+
+    def __init__(self, tool: str, log_path: Optional[str] = None, max_messages: int = MAX_MESSAGES):
+        self.tool = tool
+        self.log_path = log_path
+        self.lines = 0
+        self.errors = 0
+        self.warnings = 0
+        self.error_messages: Deque[str] = deque(maxlen=max_messages)
+        self.warning_messages: Deque[str] = deque(maxlen=max_messages)
+        self.worst_slack: Optional[float] = None
+        self.critical_delay: Optional[float] = None
+        self.cell_count: Optional[int] = None
+        self.cell_types: Dict[str, int] = {}
+        self.chip_area: Optional[float] = None
+        self.finish_time: Optional[int] = None
+        self._in_cell_table = False
+
+    def feed(self, line: str) -> None:
+        """Parse a single line of output and update the summary."""
+        line = line.rstrip("\r\n")
+        self.lines += 1
+        if not line.strip():
+            self._in_cell_table = False
+            return
+
+        match = _VERILATOR_EXIT.match(line)
+        if match:
+            # A summary of errors already counted, not a new diagnostic
+            self.errors = max(self.errors, int(match.group("count")))
+            return
+
+        match = (
+            _VERILATOR_DIAG.match(line)
+            or _IVERILOG_DIAG.match(line)
+            or _YOSYS_DIAG.match(line)
+        )
+        if match:
+            kind = match.group("kind").lower()
+            if kind in ("error", "sorry"):
+                self.errors += 1
+                self.error_messages.append(line.strip())
+            else:
+                self.warnings += 1
+                self.warning_messages.append(line.strip())
+            return
+
+        match = _YOSYS_CELLS.match(line)
+        if match:
+            # Yosys prints a stat block per module; the last one is the top
+            self.cell_count = int(match.group("count"))
+            self.cell_types = {}
+            self._in_cell_table = True
+            return
+        if self._in_cell_table:
+            match = _YOSYS_CELL_TYPE.match(line)
+            if match:
+                self.cell_types[match.group("cell")] = int(match.group("count"))
+                return
+            self._in_cell_table = False
+
+        match = _YOSYS_AREA.match(line)
+        if match:
+            try:
+                self.chip_area = float(match.group("area"))
+            except ValueError:
+                pass
+            return
+
+        match = _SLACK.search(line)
+        if match:
+            value = float(match.group("value") or match.group("value2"))
+            if self.worst_slack is None or value < self.worst_slack:
+                self.worst_slack = value
+            return
+
+        match = _DELAY.search(line)
+        if match:
+            value = float(match.group("value"))
+            if self.critical_delay is None or value > self.critical_delay:
+                self.critical_delay = value
+            return
+
+        match = _FINISH.search(line)
+        if match:
+            self.finish_time = int(match.group("time"))
+
+    @property
+    def status(self) -> str:
+        """Return a one word verdict for the run."""
+        if self.errors:
+            return "failed"
+        if self.worst_slack is not None and self.worst_slack < 0:
+            return "timing violated"
+        if self.warnings:
+            return "passed with warnings"
+        return "passed"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON serialisable representation of the summary."""
+        return {
+            "tool": self.tool,
+            "log_path": self.log_path,
+            "status": self.status,
+            "lines": self.lines,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "error_messages": list(self.error_messages),
+            "warning_messages": list(self.warning_messages),
+            "worst_slack": self.worst_slack,
+            "critical_delay": self.critical_delay,
+            "cell_count": self.cell_count,
+            "cell_types": dict(self.cell_types),
+            "chip_area": self.chip_area,
+            "finish_time": self.finish_time,
+        }
+
+    def to_text(self) -> str:
+        """Return a compact plain text summary suitable for the history."""
+        return summary_text(self.to_dict())
+
+    def renderable(self) -> Table:
+        """Build a rich table used for the live summary panel."""
+        return summary_table(self.to_dict())
+
+
+def summary_text(data: Dict[str, Any]) -> str:
+    """Format a summary dictionary (see ``LogSummary.to_dict``) as plain text."""
+    lines = [
+        f"{data['tool']}: {data['status']} "
+        f"({data['errors']} error(s), {data['warnings']} warning(s), {data['lines']} line(s))"
+    ]
+    if data.get("worst_slack") is not None:
+        lines.append(f"Worst slack: {data['worst_slack']}")
+    if data.get("critical_delay") is not None:
+        lines.append(f"Critical path delay: {data['critical_delay']}")
+    if data.get("cell_count") is not None:
+        lines.append(f"Cells: {data['cell_count']}")
+        for cell, count in sorted(data.get("cell_types", {}).items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {cell}: {count}")
+    if data.get("chip_area") is not None:
+        lines.append(f"Chip area: {data['chip_area']}")
+    if data.get("finish_time") is not None:
+        lines.append(f"$finish at: {data['finish_time']}")
+    for msg in data.get("error_messages", []):
+        lines.append(f"✗ {msg}")
+    for msg in data.get("warning_messages", []):
+        lines.append(f"! {msg}")
+    if data.get("log_path"):
+        lines.append(f"Full log: {data['log_path']}")
+    return "\n".join(lines)
+
+
+def summary_table(data: Dict[str, Any]) -> Table:
+    """Format a summary dictionary as a two column rich table."""
+    table = Table(show_header=False, box=None, padding=(0, 1))
+    table.add_column(style="bold cyan", no_wrap=True)
+    table.add_column()
+    status_style = "bold green" if data["status"] == "passed" else "bold yellow"
+    if data["errors"]:
+        status_style = "bold red"
+    table.add_row("Status", Text(data["status"], style=status_style))
+    table.add_row("Lines", str(data["lines"]))
+    table.add_row("Errors", str(data["errors"]))
+    table.add_row("Warnings", str(data["warnings"]))
+    if data.get("worst_slack") is not None:
+        table.add_row("Worst slack", str(data["worst_slack"]))
+    if data.get("critical_delay") is not None:
+        table.add_row("Critical delay", str(data["critical_delay"]))
+    if data.get("cell_count") is not None:
+        table.add_row("Cells", str(data["cell_count"]))
+    if data.get("chip_area") is not None:
+        table.add_row("Chip area", str(data["chip_area"]))
+    for msg in list(data.get("error_messages", []))[-3:]:
+        table.add_row("", Text(msg, style="red"))
+    if data.get("log_path"):
+        table.add_row("Full log", data["log_path"])
+    return table
+
+
+def stream_log(
+    lines: Iterable[str],
+    summary: LogSummary,
+    on_update: Optional[Callable[[LogSummary], None]] = None,
+    interval: float = UPDATE_INTERVAL,
+) -> LogSummary:
+    """
+    Feed ``lines`` into ``summary`` as they arrive.
+
+    ``lines`` may be any iterable, including a file object or the stdout
+    pipe of a running process. ``on_update`` is invoked at most once every
+    ``interval`` seconds while parsing, and always once at the end so the
+    final state is shown.
+    """
+    last_update = 0.0
+    for line in lines:
+        summary.feed(line)
+        if on_update is not None:
+            now = time.monotonic()
+            if now - last_update >= interval:
+                last_update = now
+                on_update(summary)
+    if on_update is not None:
+        on_update(summary)
+    return summary
@@ -0,0 +1,226 @@
+"""
+Frame buffered terminal output for the SaxoFlow CLI.
+
+Every redraw of the shell used to issue dozens of small ``console.print``
+calls, each of which ended up as its own write to the terminal. Over a
+high-latency SSH link or inside tmux that is painfully slow. The
+:class:`FrameWriter` defined here renders a whole frame into memory and
+emits it with a single write, downgrading colours to the configured depth
+and keeping byte counters so the savings can be inspected with ``/perf``.
+"""
+
+import io
+import logging
+import os
+import sys
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from rich.color import ColorSystem
+from rich.console import Console
+from rich.segment import Segment
+from rich.style import Style
+
+logger = logging.getLogger(__name__)
+
+# User facing colour depth names, deepest first.
+COLOR_DEPTHS = ("truecolor", "256", "16", "none")
+
+# ANSI sequence that homes the cursor and clears the screen and scrollback.
+CLEAR_SCREEN = "\x1b[H\x1b[2J\x1b[3J"
+
+
+def detect_color_depth(environ: Optional[Dict[str, str]] = None) -> str:
+    """Guess the colour depth supported by the terminal from the environment."""
+    env = os.environ if environ is None else environ
+    if "NO_COLOR" in env:
+        return "none"
+    term = env.get("TERM", "").lower()
+    if term == "dumb":
+        return "none"
+    if env.get("COLORTERM", "").lower() in ("truecolor", "24bit"):
+        return "truecolor"
+    if "256color" in term:
+        return "256"
+    return "16"
+
+
+def normalize_color_depth(value: str) -> str:
+    """Validate a colour depth setting, resolving ``auto`` via detection."""
+    depth = str(value).strip().lower()
+    if depth == "auto":
+        return detect_color_depth()
+    if depth not in COLOR_DEPTHS:
+        raise ValueError(
+            f"color depth must be one of auto, {', '.join(COLOR_DEPTHS)}"
+        )
+    return depth
+
+
+class Frame:
+    """
+    Collects the output of one redraw as rich segments.
+
+    Exposes the small part of the ``Console`` interface the shell uses
+    (``print``, ``width`` and ``height``). Renderables are laid out with
+    the public ``Console.render`` API; nothing reaches the terminal until
+    the owning :class:`FrameWriter` flushes the frame.
+    """
+
+    def __init__(self, layout: Console):
+        self._layout = layout
+        self.width = layout.width
+        self.height = layout.height
+        self.segments: List[Segment] = []
+        self.prints = 0
+
+    def print(self, *objects: Any) -> None:
+        """Lay out ``objects`` one after another, like ``Console.print``."""
+        self.prints += 1
+        for obj in objects or ("",):
+            renderable = self._layout.render_str(obj) if isinstance(obj, str) else obj
+            self.segments.extend(self._layout.render(renderable, self._layout.options))
+
+
+class FrameWriter:
+    """
+    Coalesce all output of a redraw into one terminal write.
+
+    Use :meth:`frame` as a context manager; it yields a :class:`Frame`
+    that collects everything printed to it. When the block exits the
+    frame is rendered at the configured colour depth, written to the real
+    terminal in one go and the frame statistics are updated.
+    """
+
+    def __init__(self, console: Console, color_depth: str = "auto", file: Optional[TextIO] = None):
+        self.console = console
+        self.file = file
+        self.color_depth = normalize_color_depth(color_depth)
+        self.frames = 0
+        self.bytes_written = 0
+        self.baseline_bytes = 0
+        self.writes_coalesced = 0
+        self.last_frame_bytes = 0
+        self._style_cache: Dict[Tuple[Style, str], Style] = {}
+
+    def set_color_depth(self, value: str) -> str:
+        """Change the colour depth used for subsequent frames."""
+        self.color_depth = normalize_color_depth(value)
+        return self.color_depth
+
+    @contextmanager
+    def frame(self, clear: bool = False) -> Iterator[Frame]:
+        """Yield a :class:`Frame` and flush it as a single write on exit."""
+        layout = Console(
+            file=io.StringIO(),
+            width=self.console.width,
+            height=self.console.height,
+            color_system="truecolor",
+            force_terminal=True,
+            legacy_windows=False,
+        )
+        frame = Frame(layout)
+        yield frame
+
+        depth = self.color_depth if self.console.is_terminal else "none"
+        data = self._render(frame.segments, depth, merge=True)
+        # What the same frame costs in truecolor without merged runs
+        baseline = self._render(frame.segments, "truecolor", merge=False)
+        if clear:
+            data = CLEAR_SCREEN + data
+            baseline = CLEAR_SCREEN + baseline
+        out = self.file or sys.stdout
+        out.write(data)
+        out.flush()
+
+        size = len(data.encode("utf-8"))
+        baseline_size = len(baseline.encode("utf-8"))
+        self.frames += 1
+        self.last_frame_bytes = size
+        self.bytes_written += size
+        self.baseline_bytes += baseline_size
+        # Every print beyond the first would have been its own terminal write
+        coalesced = max(0, frame.prints - 1)
+        self.writes_coalesced += coalesced
+        logger.debug(
+            "frame %d: %d bytes (%d at truecolor), %d writes coalesced",
+            self.frames, size, baseline_size, coalesced,
+        )
+
+    def _render(self, segments: List[Segment], depth: str, merge: bool) -> str:
+        """Turn segments into terminal output with colours reduced to ``depth``."""
+        output: List[str] = []
+        append = output.append
+        if depth == "none":
+            for text, style, control in segments:
+                if not control:
+                    append(text)
+            return "".join(output)
+        # With ``merge``, neighbouring segments that collapse to the same
+        # codes once downgraded (e.g. the banner gradient) form one run.
+        run_style: Optional[Style] = None
+        run_text: List[str] = []
+        for text, style, control in segments:
+            if control:
+                continue
+            if style:
+                converted = self._convert(style, depth)
+                if run_text and not (merge and self._same_codes(converted, run_style)):
+                    append(run_style.render("".join(run_text), color_system=ColorSystem.TRUECOLOR))
+                    run_text = []
+                run_style = converted
+                run_text.append(text)
+                continue
+            if run_text:
+                append(run_style.render("".join(run_text), color_system=ColorSystem.TRUECOLOR))
+                run_style, run_text = None, []
+            append(text)
+        if run_text:
+            append(run_style.render("".join(run_text), color_system=ColorSystem.TRUECOLOR))
+        return "".join(output)
+
+    @staticmethod
+    def _same_codes(a: Style, b: Style) -> bool:
+        """True if two styles render to identical escape sequences."""
+        if a is b:
+            return True
+        if a.link or b.link:
+            return False
+        return a.render("x", color_system=ColorSystem.TRUECOLOR) == b.render("x", color_system=ColorSystem.TRUECOLOR)
+
+    def _convert(self, style: Style, depth: str) -> Style:
+        """Return a style equivalent to ``style`` with colours reduced to ``depth``.
+
+        rich caches the ANSI codes of a style on the instance the first time
+        it is rendered, so rendering a shared style with a different
+        ``color_system`` is not reliable. Instead a separate style whose
+        colours are already at the target depth is built (and cached), and
+        always rendered as truecolor.
+        """
+        key = (style, depth)
+        converted = self._style_cache.get(key)
+        if converted is None:
+            converted = style
+            if style.color is not None or style.bgcolor is not None:
+                system = {
+                    "truecolor": ColorSystem.TRUECOLOR,
+                    "256": ColorSystem.EIGHT_BIT,
+                }.get(depth, ColorSystem.STANDARD)
+                converted = style + Style(
+                    color=style.color.downgrade(system) if style.color else None,
+                    bgcolor=style.bgcolor.downgrade(system) if style.bgcolor else None,
+                )
+            self._style_cache[key] = converted
+        return converted
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the frame counters accumulated so far."""
+        return {
+            "color_depth": self.color_depth,
+            "frames": self.frames,
+            "bytes_written": self.bytes_written,
+            "last_frame_bytes": self.last_frame_bytes,
+            "avg_frame_bytes": self.bytes_written // self.frames if self.frames else 0,
+            "bytes_saved": max(0, self.baseline_bytes - self.bytes_written),
+            "writes_coalesced": self.writes_coalesced,
+        }
@@ -0,0 +1,316 @@
+"""
+Off-thread rendering of large conversation turns.
+
+Laying out a multi-thousand-line Markdown answer is expensive, and the
+shell redraws the whole conversation on every turn. :class:`RenderCache`
+moves that work onto a worker thread and keeps the resulting segments so
+subsequent redraws only replay them. Large turns are folded to a short
+preview; :class:`Pager` shows the full text one page at a time, rendering
+only the page on screen (and pre-rendering the next one in the background).
+"""
+
+import bisect
+import io
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rich.console import Console, Group, RenderableType
+from rich.markdown import Markdown
+from rich.segment import Segment, Segments
+from rich.text import Text
+
+# Turns with more source lines (or characters) than this are folded.
+FOLD_LINES = 60
+FOLD_CHARS = 20000
+# Size of the preview shown for folded turns.
+PREVIEW_LINES = 20
+PREVIEW_CHARS = 4000
+# Longer source lines are split so a single giant line cannot fill a page.
+MAX_LINE_CHARS = 2000
+# Seconds the UI thread waits for a pending render before showing a placeholder.
+RENDER_WAIT = 0.5
+
+
+def source_of(message: Any) -> Tuple[str, bool]:
+    """Return the source text of an assistant message and whether it is Markdown."""
+    if isinstance(message, Markdown):
+        return message.markup, True
+    if isinstance(message, Text):
+        return message.plain, False
+    return str(message), False
+
+
+def is_large(source: str) -> bool:
+    """True if a message is big enough to be folded in the conversation."""
+    return len(source) > FOLD_CHARS or source.count("\n") >= FOLD_LINES
+
+
+_FENCE = re.compile(r"^[ \t]*(```|~~~).*$", re.M)
+
+
+def fence_transitions(source: str) -> Tuple[List[int], List[Optional[str]]]:
+    """
+    Find where code fences open and close in ``source``.
+
+    Returns two parallel lists: the line numbers just after each fence
+    line, and the fence that is open from that line on (``None`` once it
+    closes). Pages cut Markdown at arbitrary lines; knowing the open fence
+    lets a page reopen it so code blocks keep rendering as code.
+    """
+    starts: List[int] = []
+    fences: List[Optional[str]] = []
+    fence: Optional[str] = None
+    line = 0
+    pos = 0
+    for match in _FENCE.finditer(source):
+        line += source.count("\n", pos, match.start())
+        pos = match.start()
+        stripped = match.group(0).strip()
+        if fence is None:
+            fence = stripped
+        elif fence.startswith(match.group(1)):
+            fence = None
+        else:
+            continue
+        starts.append(line + 1)
+        fences.append(fence)
+    return starts, fences
+
+
+def fence_at(transitions: Tuple[List[int], List[Optional[str]]], line: int) -> Optional[str]:
+    """Return the fence open at the start of ``line`` (see ``fence_transitions``)."""
+    starts, fences = transitions
+    idx = bisect.bisect_right(starts, line) - 1
+    return fences[idx] if idx >= 0 else None
+
+
+def markdown_slice(lines: List[str], start: int, end: int, fence: Optional[str]) -> str:
+    """Join ``lines[start:end]``, reopening ``fence`` if the slice starts inside one."""
+    chunk = lines[start:end]
+    if fence is not None:
+        chunk = [fence] + chunk
+    return "\n".join(chunk)
+
+
+def render_rows(renderable: RenderableType, width: int) -> List[List[Segment]]:
+    """Lay out ``renderable`` at ``width`` and return one list of segments per screen row."""
+    con = Console(
+        file=io.StringIO(),
+        width=max(width, 1),
+        color_system="truecolor",
+        force_terminal=True,
+        legacy_windows=False,
+    )
+    return con.render_lines(renderable, con.options, pad=False)
+
+
+def rows_to_segments(rows: List[List[Segment]]) -> Segments:
+    """Join screen rows back into a single replayable renderable."""
+    segments: List[Segment] = []
+    for row in rows:
+        segments.extend(row)
+        segments.append(Segment.line())
+    return Segments(segments)
+
+
+def render_segments(renderable: RenderableType, width: int) -> Segments:
+    """Lay out ``renderable`` at ``width`` and return the result as replayable segments."""
+    return rows_to_segments(render_rows(renderable, width))
+
+
+def preview(message: Any, turn: int, total: int) -> RenderableType:
+    """Build the folded preview shown in place of a large message of ``total`` lines."""
+    source, markdown = source_of(message)
+    lines = source[:PREVIEW_CHARS].split("\n")[:PREVIEW_LINES]
+    note = Text(
+        f"… {total - len(lines)} more line(s) folded ({len(source)} chars) — /view {turn} to read it all",
+        style="dim italic",
+    )
+    if markdown:
+        body: RenderableType = Markdown(markdown_slice(lines, 0, len(lines), None))
+    else:
+        body = Text("\n".join(lines))
+    return Group(body, note)
+
+
+class RenderCache:
+    """
+    Render conversation turns on a worker thread and cache the result.
+
+    Entries are keyed by turn index and invalidated when the message
+    object or the target width changes.
+    """
+
+    def __init__(self, workers: int = 1):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="coolcli-render")
+        self._lock = threading.Lock()
+        self._entries: Dict[Any, Tuple[Any, int, Future]] = {}
+        # Per turn: (message, is large, number of source lines)
+        self._sizes: Dict[int, Tuple[Any, bool, int]] = {}
+
+    def render_async(self, renderable: RenderableType, width: int, rows: bool = False) -> Future:
+        """Render ``renderable`` on the worker thread without caching it.
+
+        The future resolves to replayable ``Segments``, or to a list of
+        screen rows when ``rows`` is set.
+        """
+        return self._executor.submit(render_rows if rows else render_segments, renderable, width)
+
+    def submit(self, key: Any, message: Any, width: int, build: Callable[[], RenderableType]) -> Future:
+        """Schedule ``build()`` for rendering unless an up to date entry exists.
+
+        ``build`` is only called when a new render is actually needed.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is message and entry[1] == width:
+                return entry[2]
+            future = self.render_async(build(), width)
+            self._entries[key] = (message, width, future)
+            return future
+
+    def turn(self, index: int, message: Any, width: int, wait: float = RENDER_WAIT) -> RenderableType:
+        """
+        Return the renderable to show for conversation turn ``index``.
+
+        Small messages are returned as is. Large ones are folded to a
+        preview rendered on the worker thread; if it is not ready within
+        ``wait`` seconds a placeholder is returned instead.
+        """
+        large, total = self._size(index, message)
+        if not large:
+            return message if not isinstance(message, str) else Text(message)
+        future = self.submit(("turn", index), message, width, lambda: preview(message, index + 1, total))
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout:
+            return Text("⏳ Rendering…", style="dim")
+
+    def _size(self, index: int, message: Any) -> Tuple[bool, int]:
+        """Return whether a turn is large and its line count, cached per message."""
+        with self._lock:
+            entry = self._sizes.get(index)
+            if entry is not None and entry[0] is message:
+                return entry[1], entry[2]
+        source, _ = source_of(message)
+        large, total = is_large(source), source.count("\n") + 1
+        with self._lock:
+            self._sizes[index] = (message, large, total)
+        return large, total
+
+    def prune(self, turns: int) -> None:
+        """Drop cached turns beyond the current conversation length."""
+        with self._lock:
+            for key in list(self._entries):
+                if key[1] >= turns:
+                    del self._entries[key]
+            for index in list(self._sizes):
+                if index >= turns:
+                    del self._sizes[index]
+
+
+class Pager:
+    """
+    Page through the full text of a conversation turn.
+
+    The source is split into lines once and laid out in blocks of source
+    lines, one block at a time, only when needed. Each block is cut into
+    screens of exactly ``height`` rendered rows, so wrapped long lines
+    never push a page past the terminal. The following block is
+    pre-rendered on the worker thread so moving forward stays smooth even
+    for very large responses, and only the blocks adjacent to the current
+    one are kept in memory.
+    """
+
+    def __init__(self, cache: RenderCache, turn: int, message: Any, width: int, height: int):
+        self.cache = cache
+        self.turn = turn
+        self.message = message
+        self.width = width
+        self.height = max(height, 1)
+        # A block rarely renders to fewer rows than it has source lines
+        self.block_lines = self.height
+        source, self.markdown = source_of(message)
+        self.lines = source.split("\n")
+        if any(len(line) > MAX_LINE_CHARS for line in self.lines):
+            self.lines = [
+                line[i:i + MAX_LINE_CHARS]
+                for line in self.lines
+                for i in range(0, max(len(line), 1), MAX_LINE_CHARS)
+            ]
+            source = "\n".join(self.lines)
+        self.fences = fence_transitions(source) if self.markdown else None
+        self.blocks = max(1, -(-len(self.lines) // self.block_lines))
+        # Current position: block index and first row shown within it
+        self.block = 0
+        self.row = 0
+        self._rendered: Dict[int, Future] = {}
+
+    def _renderable(self, block: int) -> RenderableType:
+        start = block * self.block_lines
+        end = min(start + self.block_lines, len(self.lines))
+        if self.markdown:
+            fence = fence_at(self.fences, start)
+            return Markdown(markdown_slice(self.lines, start, end, fence))
+        return Text("\n".join(self.lines[start:end]))
+
+    def _rows(self, block: int) -> List[List[Segment]]:
+        future = self._rendered.get(block)
+        if future is None:
+            future = self.cache.render_async(self._renderable(block), self.width, rows=True)
+            self._rendered[block] = future
+        return future.result()
+
+    def screen(self) -> Segments:
+        """Return the rendered rows currently on screen (at most ``height``)."""
+        rows = self._rows(self.block)
+        if self.block + 1 < self.blocks and self.block + 1 not in self._rendered:
+            self._rendered[self.block + 1] = self.cache.render_async(
+                self._renderable(self.block + 1), self.width, rows=True
+            )
+        for cached in list(self._rendered):
+            if abs(cached - self.block) > 1:
+                del self._rendered[cached]
+        return rows_to_segments(rows[self.row:self.row + self.height])
+
+    def next(self) -> bool:
+        """Advance one screen. Returns False if already at the end."""
+        if self.row + self.height < len(self._rows(self.block)):
+            self.row += self.height
+            return True
+        if self.block + 1 < self.blocks:
+            self.block += 1
+            self.row = 0
+            return True
+        return False
+
+    def previous(self) -> bool:
+        """Go back one screen. Returns False if already at the start."""
+        if self.row > 0:
+            self.row = max(self.row - self.height, 0)
+            return True
+        if self.block > 0:
+            self.block -= 1
+            rows = len(self._rows(self.block))
+            self.row = max(((rows - 1) // self.height) * self.height, 0)
+            return True
+        return False
+
+    def goto_line(self, line: int) -> None:
+        """Jump to the screen starting the block that contains source ``line`` (1-based)."""
+        line = min(max(line, 1), len(self.lines))
+        self.block = (line - 1) // self.block_lines
+        self.row = 0
+
+    def location(self) -> str:
+        """Describe the current position, e.g. ``lines 41–80 of 500``."""
+        start = self.block * self.block_lines + 1
+        end = min(start + self.block_lines - 1, len(self.lines))
+        text = f"lines {start}–{end} of {len(self.lines)}"
+        screens = -(-len(self._rows(self.block)) // self.height)
+        if screens > 1:
+            text += f", part {self.row // self.height + 1}/{screens}"
+        return text
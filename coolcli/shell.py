@@ -5,14 +5,21 @@ Interactive command‑line interface for the SaxoFlow project.
 
 import json
 import os
+import threading
 import time
 from typing import Any, Dict, List, Optional
 
 from rich.console import Console
+from rich.live import Live
 from rich.text import Text
 from rich.markdown import Markdown
 from coolcli.banner import print_banner
 from coolcli.commands import handle_command
+from coolcli.client import BackendClient, BackendError, client_from_config, http_backend
+from coolcli.compare import available_models, compare_models, comparison_table, comparison_text
+from coolcli.logparse import LogSummary, stream_log
+from coolcli.output import Frame, FrameWriter, normalize_color_depth
+from coolcli.render import Pager, RenderCache
 from coolcli.panels import user_input_panel, ai_panel
 from prompt_toolkit import PromptSession
 from prompt_toolkit.history import InMemoryHistory
@@ -37,7 +44,35 @@ config: Dict[str, Any] = {
     "temperature": 0.7,
     "top_k": 1,
     "top_p": 1.0,
+    # Terminal output: colour depth (auto/truecolor/256/16/none) and a
+    # low-bandwidth mode that drops gradients and panels.
+    "color_depth": "auto",
+    "low_bandwidth": False,
+    # `/compare`: number of models queried at once and per-model timeout (s)
+    "compare_concurrency": 4,
+    "compare_timeout": 60.0,
+    # Model backend: HTTP endpoint (empty for the placeholder), connection
+    # pool size, client-side rate limit (requests/s, 0 = off), retries and
+    # per-request timeout (s).
+    "endpoint": "",
+    "max_connections": 4,
+    "rate_limit": 0.0,
+    "rate_burst": 1,
+    "retries": 3,
+    "request_timeout": 60.0,
 }
+# Buffers each redraw into a single terminal write
+frames = FrameWriter(console, config["color_depth"])
+# Lays out large assistant turns on a worker thread and caches the result
+renderer = RenderCache()
+# Pooled backend client, rebuilt whenever its settings in `config` change
+backend_client: Optional[BackendClient] = None
+_backend_settings: Optional[tuple] = None
+_backend_lock = threading.Lock()
+# Extra fields for the history entry of the command currently being run
+# (e.g. the structured summary of a `/simulate` log). The main loop merges
+# them into the turn instead of storing the raw renderable.
+pending_turn: Optional[Dict[str, Any]] = None
 
 
 def clear_terminal() -> None:
@@ -106,14 +141,18 @@ def load_session(filename: str) -> Text:
     try:
         with open(filename, "r", encoding="utf-8") as fh:
             data = json.load(fh)
+        loaded_config = data.get("config", {})
+        # Validate before touching any session state
+        color_depth = normalize_color_depth(loaded_config.get("color_depth", config["color_depth"]))
         conversation_history = data.get("conversation_history", [])
         attachments = []
         for att in data.get("attachments", []):
             attachments.append({"name": att["name"], "content": b""})
         system_prompt = data.get("system_prompt", "")
         # merge config preserving unknown keys
-        loaded_config = data.get("config", {})
         config.update(loaded_config)
+        frames.set_color_depth(color_depth)
+        renderer.prune(0)
         return Text(f"📂 Session loaded from {filename}", style="cyan")
     except Exception as exc:
         return Text(f"❌ Failed to load session: {exc}", style="bold red")
@@ -174,13 +213,76 @@ def clear_history() -> Text:
     """Erase all conversation history and attachments."""
     conversation_history.clear()
     attachments.clear()
+    renderer.prune(0)
     return Text("Conversation history and attachments cleared.", style="light cyan")
 
 
 def list_models() -> Text:
-    """Return a list of available models. Placeholder implementation."""
-    models = ["placeholder-model-1", "placeholder-model-2"]
-    return Text("Available models:\n- " + "\n- ".join(models), style="light cyan")
+    """Return the models that have a registered backend."""
+    models = available_models()
+    text = "Available models:\n- " + "\n- ".join(models)
+    if config.get("endpoint"):
+        text += f"\n\nOther model names are sent to {config['endpoint']}"
+    return Text(text, style="light cyan")
+
+
+def parse_bool(value: str) -> bool:
+    """Interpret common on/off spellings used with `/set`."""
+    lowered = value.strip().lower()
+    if lowered in ("1", "true", "on", "yes"):
+        return True
+    if lowered in ("0", "false", "off", "no"):
+        return False
+    raise ValueError(f"expected on/off, got {value!r}")
+
+
+def get_backend_client() -> Optional[BackendClient]:
+    """Return the pooled client for ``config["endpoint"]``, if one is set.
+
+    The client (and with it the connection pool) is shared by every turn
+    and only rebuilt when one of its settings changes.
+    """
+    global backend_client, _backend_settings
+    settings = tuple(config.get(key) for key in (
+        "endpoint", "max_connections", "rate_limit", "rate_burst", "retries", "request_timeout",
+    ))
+    with _backend_lock:
+        if settings != _backend_settings:
+            if backend_client is not None:
+                backend_client.close()
+            backend_client = client_from_config(config) if config.get("endpoint") else None
+            _backend_settings = settings
+        return backend_client
+
+
+def get_perf() -> Text:
+    """Report terminal output and backend client statistics."""
+    stats = frames.stats()
+    text = Text(
+        "📈 Output performance\n"
+        f"Color depth: {stats['color_depth']}"
+        f"{' (low bandwidth)' if config.get('low_bandwidth') else ''}\n"
+        f"Frames: {stats['frames']}\n"
+        f"Bytes written: {stats['bytes_written']} "
+        f"(last frame {stats['last_frame_bytes']}, average {stats['avg_frame_bytes']})\n"
+        f"Bytes saved vs truecolor: {stats['bytes_saved']}\n"
+        f"Writes coalesced: {stats['writes_coalesced']}",
+        style="light cyan",
+    )
+    if backend_client is not None:
+        metrics = backend_client.metrics()
+        pool = metrics["pool"]
+        text.append(
+            f"\n\n🔌 Backend {metrics['endpoint']}\n"
+            f"Pool: {pool['in_use']} in use, {pool['idle']} idle, {pool['waiting']} waiting "
+            f"(size {pool['size']}, {pool['created']} created, {pool['reused']} reused)\n"
+            f"Requests: {metrics['requests']} ({metrics['upstream_calls']} upstream, "
+            f"{metrics['coalesced']} coalesced, {metrics['inflight']} in flight)\n"
+            f"Rate limit: {metrics['rate_limit'] or 'off'} req/s "
+            f"({metrics['rate_waiting']} waiting, {metrics['rate_throttled']} throttled)\n"
+            f"Retries: {metrics['retried']}, failures: {metrics['failures']}"
+        )
+    return text
 
 
 def update_config(param: str, value: str) -> Text:
@@ -193,6 +295,32 @@ def update_config(param: str, value: str) -> Text:
             config["top_k"] = int(value)
         elif key == "top_p":
             config["top_p"] = float(value)
+        elif key == "endpoint":
+            previous = config["endpoint"]
+            config["endpoint"] = value.strip()
+            try:
+                get_backend_client()
+            except ValueError:
+                config["endpoint"] = previous
+                raise
+        elif key in ("max_connections", "rate_burst", "retries"):
+            config[key] = max(0, int(value))
+        elif key == "rate_limit":
+            config["rate_limit"] = max(0.0, float(value))
+        elif key == "request_timeout":
+            timeout = float(value)
+            if timeout <= 0:
+                raise ValueError("request_timeout must be positive")
+            config["request_timeout"] = timeout
+        elif key == "compare_concurrency":
+            config["compare_concurrency"] = max(1, int(value))
+        elif key == "compare_timeout":
+            config["compare_timeout"] = float(value)
+        elif key == "color_depth":
+            frames.set_color_depth(value)
+            config["color_depth"] = value.strip().lower()
+        elif key == "low_bandwidth":
+            config["low_bandwidth"] = parse_bool(value)
         else:
             return Text(f"❌ Unknown config parameter: {param}", style="red")
         return Text(f"⚙️ Updated {param} to {value}", style="cyan")
@@ -200,15 +328,150 @@ def update_config(param: str, value: str) -> Text:
         return Text(f"❌ Failed to update config: {exc}", style="red")
 
 
+def view_turn(arg: str) -> Text:
+    """Page through the full assistant output of a conversation turn.
+
+    Only the screen being shown is rendered (the next block is prepared
+    in the background), so even very large responses can be browsed
+    smoothly. Turns are numbered from 1 in the order they appear.
+    """
+    try:
+        index = int(arg) - 1
+    except ValueError:
+        return Text("❌ Usage: /view <turn>", style="red")
+    if not 0 <= index < len(conversation_history) or not conversation_history[index].get("assistant"):
+        return Text(f"❌ No assistant output for turn {arg}", style="red")
+    # Leave room for the header and the key prompt
+    pager = Pager(
+        renderer,
+        index,
+        conversation_history[index]["assistant"],
+        width=console.width,
+        height=max(console.height - 2, 1),
+    )
+    hint = "Enter/n: next  p: previous  g<line>: go to line  q: quit"
+    notice = ""
+    while True:
+        if os.name == "nt":
+            clear_terminal()
+        with frames.frame(clear=os.name != "nt") as con:
+            header = Text(f"Turn {index + 1} — {pager.location()}", style="bold violet")
+            if notice:
+                header.append(f"  {notice}", style="yellow")
+            con.print(header)
+            con.print(pager.screen())
+        notice = ""
+        try:
+            key = console.input(f"[dim]{hint}[/dim] ").strip().lower()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if key in ("q", "quit"):
+            break
+        elif key in ("", "n"):
+            if not pager.next():
+                notice = "(end)"
+        elif key in ("p", "b"):
+            if not pager.previous():
+                notice = "(start)"
+        elif key.startswith("g") and key[1:].strip().isdigit():
+            pager.goto_line(int(key[1:]))
+        else:
+            notice = f"Unknown key {key!r}. {hint}"
+    return Text(f"📖 Viewed turn {index + 1} ({len(pager.lines)} line(s))", style="light cyan")
+
+
+def summarize_log(tool: str, path: str) -> Text:
+    """Stream a simulation or synthesis log and summarise it.
+
+    The log is read line by line while a live summary panel is refreshed
+    at a throttled rate, so arbitrarily long logs can be processed with
+    bounded memory. Only the structured summary and the path of the full
+    log are kept for the conversation history. The log must already
+    exist; output of a still running tool is not followed.
+    """
+    global pending_turn
+    if not os.path.isfile(path):
+        return Text(f"❌ Log file not found: {path}", style="bold red")
+    summary = LogSummary(tool, log_path=os.path.abspath(path))
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as fh:
+            with Live(ai_panel(summary.renderable()), console=console, auto_refresh=False, transient=True) as live:
+                stream_log(fh, summary, on_update=lambda s: live.update(ai_panel(s.renderable()), refresh=True))
+    except Exception as exc:
+        return Text(f"❌ Failed to read log: {exc}", style="bold red")
+    text = Text(summary.to_text(), style="red" if summary.errors else "cyan")
+    # Keep only the plain summary and a pointer to the full log
+    pending_turn = {"assistant": text.plain, "log_summary": summary.to_dict()}
+    return text
+
+
+def build_request(prompt: str) -> Dict[str, Any]:
+    """Assemble the request sent to a model backend for ``prompt``."""
+    return {
+        "prompt": prompt,
+        "system_prompt": system_prompt,
+        "attachments": [att["name"] for att in attachments],
+        "temperature": config["temperature"],
+        "top_k": config["top_k"],
+        "top_p": config["top_p"],
+    }
+
+
+def run_comparison(arg: str) -> Text:
+    """Send one prompt to several models at once and show them side by side.
+
+    ``arg`` is a comma separated list of model names (or ``all``)
+    followed by the prompt. Responses stream into a live side-by-side
+    view; the history records each model's response together with its
+    latency, time to first token and token count.
+    """
+    global pending_turn
+    parts = arg.split(maxsplit=1)
+    if len(parts) < 2:
+        return Text("❌ Usage: /compare <model1,model2,...|all> <prompt>", style="red")
+    names, prompt = parts
+    models = available_models() if names.lower() == "all" else [m for m in names.split(",") if m]
+    try:
+        client = get_backend_client()
+    except ValueError as exc:
+        return Text(f"❌ {exc}", style="red")
+    extra = {}
+    if client is not None:
+        # Unknown models are served by the current endpoint, sharing its pool
+        extra = {model: http_backend(client, model) for model in models if model not in available_models()}
+    try:
+        with Live(console=console, auto_refresh=False, transient=True) as live:
+            results = compare_models(
+                models,
+                build_request(prompt),
+                concurrency=config["compare_concurrency"],
+                timeout=config["compare_timeout"],
+                on_update=lambda res: live.update(comparison_table(res), refresh=True),
+                backends=extra,
+            )
+    except KeyError as exc:
+        return Text(f"❌ {exc.args[0]}. Use /models to list them.", style="red")
+    text = comparison_text(results)
+    pending_turn = {"assistant": text, "comparison": [result.to_dict() for result in results]}
+    return Text(text)
+
+
 def simulate_ai_response(prompt: str) -> str:
     """
-    Placeholder AI response generator.
+    AI response generator.
 
-    In a real implementation this function would call into the SaxoFlow
-    backend or an external model. To illustrate streaming behaviour and
-    attachments/system prompt awareness, the returned string echoes
-    the user's prompt along with contextual information.
+    When ``config["endpoint"]`` is set the assembled request is sent to
+    the model backend through the pooled, rate-limited client. Otherwise a
+    placeholder echoes the user's prompt along with contextual
+    information to illustrate attachments/system prompt awareness.
     """
+    try:
+        client = get_backend_client()
+        if client is not None:
+            data = client.post_json(dict(build_request(prompt), model=config["model"]))
+            return data.get("text", "") if isinstance(data, dict) else str(data)
+    except (BackendError, ValueError) as exc:
+        return f"❌ Backend request failed: {exc}"
     response = f"I received your message: '{prompt}'. (AI response placeholder)"
     if attachments:
         response += "\n\nAttached file(s): " + ", ".join(att["name"] for att in attachments)
@@ -235,8 +498,12 @@ def process_command(cmd: str) -> Optional[Any]:
     elif keyword in ["/quit", "quit"]:
         return None
     elif keyword in ["/simulate", "simulate"]:
+        if arg:
+            return summarize_log("simulation", arg)
         return Text("Running simulation... (placeholder)", style="cyan")
     elif keyword in ["/synth", "synth"]:
+        if arg:
+            return summarize_log("synthesis", arg)
         return Text("Running synthesis... (placeholder)", style="cyan")
     elif keyword in ["/ai", "ai"]:
         return Text("AI agent feature coming soon!", style="bold blue")
@@ -254,6 +521,12 @@ def process_command(cmd: str) -> Optional[Any]:
         return set_system_prompt(arg)
     elif keyword in ["/clear", "clear"]:
         return clear_history()
+    elif keyword in ["/view", "view"]:
+        return view_turn(arg)
+    elif keyword in ["/perf", "perf"]:
+        return get_perf()
+    elif keyword in ["/compare", "compare"]:
+        return run_comparison(arg)
     elif keyword in ["/models", "models"]:
         return list_models()
     elif keyword in ["/set", "set"]:
@@ -267,59 +540,74 @@ def process_command(cmd: str) -> Optional[Any]:
         return handle_command(cmd, console)
 
 
+WELCOME_MESSAGE = "Welcome to SaxoFlow CLI! Take your first step toward mastering digital design and verification."
+
+TIPS = Text(
+    "Tips for getting started:\n"
+    "1. Ask questions, edit files, or run commands.\n"
+    "2. Be specific for the best results.\n"
+    "3. Use /help to see available commands.\n"
+    "4. Type /quit to exit the CLI.\n",
+    style="rgb(255,215,0)",
+)
+
+
+def render_header(con: Frame) -> None:
+    """Print the banner, welcome message and tips to ``con``."""
+    low_bandwidth = config.get("low_bandwidth", False)
+    print_banner(con, gradient=not low_bandwidth)
+    if low_bandwidth:
+        con.print(Text(WELCOME_MESSAGE, style="bold white"))
+    else:
+        con.print(user_input_panel(WELCOME_MESSAGE, width=int(con.width * 0.75)))
+    con.print(TIPS)
+    con.print("")
+
+
+def render_history(con: Frame) -> None:
+    """Print every conversation turn to ``con``."""
+    low_bandwidth = config.get("low_bandwidth", False)
+    # Dynamically calculate panel width in case the terminal was resized
+    panel_width = int(con.width * 0.75)
+    # Content width inside an ai_panel: borders plus horizontal padding
+    content_width = con.width if low_bandwidth else con.width - 6
+    for index, entry in enumerate(conversation_history):
+        # user turn
+        if low_bandwidth:
+            con.print(Text(f"> {entry.get('user', '')}", style="bold white"))
+        else:
+            con.print(user_input_panel(entry.get("user", ""), width=panel_width))
+        # assistant turn
+        assistant_msg = entry.get("assistant")
+        if assistant_msg:
+            # Large turns are folded to a preview laid out off-thread
+            assistant_renderable = renderer.turn(index, assistant_msg, content_width)
+            con.print(assistant_renderable if low_bandwidth else ai_panel(assistant_renderable))
+        con.print("")  # spacing between turns
+
+
 def main() -> None:
     """
     Entry point for the SaxoFlow CLI.
 
-    This function sets up the prompt history, prints the banner and
-    startup tips, then enters an infinite loop reading user input.
-    It re‑renders the entire conversation each turn to accommodate
-    dynamic terminal resizing. Commands are processed via
+    This function sets up the prompt history, then enters an infinite
+    loop reading user input. Before each prompt the banner, tips and the
+    entire conversation are re‑rendered into a single buffered frame to
+    accommodate dynamic terminal resizing. Commands are processed via
     ``process_command``; normal input is passed to ``simulate_ai_response``
     after a brief delay to simulate streaming.
     """
+    global pending_turn
     cli_history = InMemoryHistory()
     session = PromptSession(history=cli_history)
 
-    # Print the welcome banner and tips once at startup
-    clear_terminal()
-    print_banner(console)
-    panel_width = int(console.width * 0.75)
-    console.print(user_input_panel(
-        "Welcome to SaxoFlow CLI! Take your first step toward mastering digital design and verification.",
-        width=panel_width,
-    ))
-    console.print("")
-    tips = Text(
-        "Tips for getting started:\n"
-        "1. Ask questions, edit files, or run commands.\n"
-        "2. Be specific for the best results.\n"
-        "3. Use /help to see available commands.\n"
-        "4. Type /quit to exit the CLI.\n",
-        style="rgb(255,215,0)",
-    )
-    console.print(tips)
-    console.print("")
-
     while True:
-        # Dynamically calculate panel width in case the terminal was resized
-        panel_width = int(console.width * 0.75)
-        # Render the conversation history
-        for entry in conversation_history:
-            # user turn
-            upanel = user_input_panel(entry.get("user", ""), width=panel_width)
-            console.print(upanel)
-            # assistant turn
-            assistant_msg = entry.get("assistant")
-            if assistant_msg:
-                # Convert strings to Text
-                if isinstance(assistant_msg, str):
-                    assistant_renderable = Text(assistant_msg)
-                else:
-                    assistant_renderable = assistant_msg
-                opanel = ai_panel(assistant_renderable)
-                console.print(opanel)
-            console.print("")  # spacing between turns
+        # Clear and re‑render everything as one write to the terminal
+        if os.name == "nt":
+            clear_terminal()
+        with frames.frame(clear=os.name != "nt") as con:
+            render_header(con)
+            render_history(con)
 
         # Read user input
         try:
@@ -330,15 +618,6 @@ def main() -> None:
         user_input = user_input.strip()
         if not user_input:
             # Re‑display the header if the user just presses Enter
-            clear_terminal()
-            print_banner(console)
-            panel_width = int(console.width * 0.75)
-            console.print(user_input_panel(
-                "Welcome to SaxoFlow CLI! Take your first step toward mastering digital design and verification.",
-                width=panel_width,
-            ))
-            console.print(tips)
-            console.print("")
             continue
 
         # Handle slash commands
@@ -348,24 +627,20 @@ def main() -> None:
                 console.print("[cyan]Until next time, may your timing constraints always be met and your logic always latch-free.[/cyan]")
                 break
             # Append the command and its output to the conversation history
-            conversation_history.append({"user": user_input, "assistant": renderable})
+            entry = {"user": user_input, "assistant": renderable}
+            if pending_turn is not None:
+                entry.update(pending_turn)
+                pending_turn = None
+            conversation_history.append(entry)
         else:
             # Normal conversation – send to the AI
             conversation_history.append({"user": user_input})
             # Show a spinner while generating the response
             with console.status("[yellow]Thinking...", spinner="dots") as status:
-                # Sleep for a moment to emulate latency and streaming
-                time.sleep(1)
+                if not config.get("endpoint"):
+                    # Sleep for a moment to emulate latency for the placeholder
+                    time.sleep(1)
                 response = simulate_ai_response(user_input)
-            conversation_history[-1]["assistant"] = response
-
-        # After each interaction, clear and re‑render everything
-        clear_terminal()
-        print_banner(console)
-        panel_width = int(console.width * 0.75)
-        console.print(user_input_panel(
-            "Welcome to SaxoFlow CLI! Take your first step toward mastering digital design and verification.",
-            width=panel_width,
-        ))
-        console.print(tips)
-        console.print("")
\ No newline at end of file
+                conversation_history[-1]["assistant"] = response
+                # Lay out a large answer on the worker while the spinner runs
+                renderer.turn(len(conversation_history) - 1, response, console.width - 6)
@@ -0,0 +1,181 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from coolcli import compare
+from coolcli.client import BackendClient, BackendError, TokenBucket, http_backend
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Echo backend speaking HTTP/1.1 keep-alive, configured via the server."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.calls += 1
+            fail = server.failures > 0
+            if fail:
+                server.failures -= 1
+        if fail:
+            self.send_response(503)
+            self.send_header("Retry-After", server.retry_after)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(server.delay)
+        body = json.dumps({"text": f"{server.name}: {payload.get('prompt')}"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client timed out and hung up
+
+
+@pytest.fixture
+def stub_server():
+    """Start local stub HTTP servers; yields a factory returning their URLs."""
+    servers = []
+
+    def start(name="stub", delay=0.0, failures=0, retry_after="0"):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.daemon_threads = True
+        server.name, server.delay, server.failures = name, delay, failures
+        server.retry_after = retry_after
+        server.calls = 0
+        server.lock = threading.Lock()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}/generate"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_keep_alive_connections_are_reused(stub_server):
+    server, url = stub_server()
+    client = BackendClient(url, coalesce=False)
+    for i in range(3):
+        assert client.post_json({"prompt": str(i)}) == {"text": f"stub: {i}"}
+    pool = client.metrics()["pool"]
+    assert pool["created"] == 1
+    assert pool["reused"] == 2
+    client.close()
+
+
+def test_retries_on_503_with_retry_after(stub_server):
+    server, url = stub_server(failures=2)
+    client = BackendClient(url, retries=3)
+    assert client.post_json({"prompt": "x"}) == {"text": "stub: x"}
+    metrics = client.metrics()
+    assert metrics["retried"] == 2
+    assert metrics["failures"] == 0
+    assert server.calls == 3
+
+
+def test_gives_up_after_retries(stub_server):
+    server, url = stub_server(failures=5)
+    client = BackendClient(url, retries=1)
+    with pytest.raises(BackendError) as exc:
+        client.post_json({"prompt": "x"})
+    assert exc.value.status == 503
+    assert client.metrics()["failures"] == 1
+
+
+def test_identical_requests_are_coalesced(stub_server):
+    server, url = stub_server(delay=0.3)
+    client = BackendClient(url)
+    barrier = threading.Barrier(5)
+    responses = []
+
+    def call():
+        barrier.wait()
+        responses.append(client.post_json({"prompt": "same"}))
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert responses == [{"text": "stub: same"}] * 5
+    metrics = client.metrics()
+    assert metrics["upstream_calls"] == 1
+    assert metrics["coalesced"] == 4
+    assert server.calls == 1
+
+
+def test_token_bucket_throttles():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.18
+    assert bucket.throttled == 4
+
+
+def test_compare_follows_endpoint_changes(stub_server):
+    from coolcli import shell
+
+    _, url_a = stub_server(name="server-A")
+    _, url_b = stub_server(name="server-B")
+    try:
+        shell.update_config("endpoint", url_a)
+        assert "server-A: hi" in shell.run_comparison("remote hi").plain
+        shell.update_config("endpoint", url_b)
+        assert "server-B: hi" in shell.run_comparison("remote hi").plain
+        shell.update_config("endpoint", "")
+        assert "unknown model" in shell.run_comparison("remote hi").plain
+        assert "remote" not in shell.list_models().plain
+    finally:
+        shell.config["endpoint"] = ""
+        shell.pending_turn = None
+        shell.get_backend_client()
+
+
+def test_timeout_is_not_retried(stub_server):
+    server, url = stub_server(delay=1.0)
+    client = BackendClient(url, retries=3, timeout=0.2)
+    start = time.monotonic()
+    with pytest.raises(BackendError, match="timed out"):
+        client.post_json({"prompt": "slow"})
+    assert time.monotonic() - start < 0.9
+    assert server.calls == 1
+    assert client.metrics()["upstream_calls"] == 1
+    assert client.metrics()["retried"] == 0
+
+
+def test_long_retry_after_fails_fast(stub_server):
+    server, url = stub_server(failures=1, retry_after="120")
+    client = BackendClient(url, retries=3, max_backoff=1.0)
+    start = time.monotonic()
+    with pytest.raises(BackendError, match="retry after 120s"):
+        client.post_json({"prompt": "x"})
+    assert time.monotonic() - start < 1
+    assert server.calls == 1
+
+
+def test_compare_timeout_releases_connection(stub_server):
+    server, url = stub_server(delay=1.0)
+    client = BackendClient(url, max_connections=1)
+    result = compare.compare_models(
+        ["slow"], {"prompt": "x"}, timeout=0.2, interval=0.01,
+        backends={"slow": http_backend(client, "slow")},
+    )[0]
+    assert result.status == "timeout"
+    server.delay = 0.0
+    start = time.monotonic()
+    assert client.post_json({"prompt": "next"}, timeout=2.0)["text"] == "stub: next"
+    assert time.monotonic() - start < 0.5
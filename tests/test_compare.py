@@ -0,0 +1,108 @@
+import threading
+import time
+
+import pytest
+
+from coolcli import compare
+
+
+@pytest.fixture
+def backends():
+    """Register stub backends for one test and remove them afterwards."""
+    names = []
+
+    def register(name, backend):
+        compare.register_backend(name, backend)
+        names.append(name)
+
+    yield register
+    for name in names:
+        compare.unregister_backend(name)
+
+
+def fast(request):
+    yield "hello "
+    yield request["prompt"]
+
+
+def test_compare_records_metrics(backends):
+    backends("fast", fast)
+    results = compare.compare_models(["fast"], {"prompt": "world"}, interval=0.01)
+    record = results[0].to_dict()
+    assert record["status"] == "done"
+    assert record["response"] == "hello world"
+    assert record["tokens"] == 2
+    assert record["ttft"] is not None and record["latency"] >= record["ttft"]
+
+
+def test_compare_reports_backend_errors(backends):
+    def broken(request):
+        raise RuntimeError("backend down")
+        yield  # pragma: no cover
+
+    backends("broken", broken)
+    result = compare.compare_models(["broken"], {"prompt": "x"}, interval=0.01)[0]
+    assert result.status == "error"
+    assert result.error == "backend down"
+
+
+def test_timed_out_backend_frees_its_slot(backends):
+    release = threading.Event()
+
+    def blocking(request):
+        yield "partial "
+        release.wait(10)
+        yield "late"
+
+    backends("blocking", blocking)
+    backends("fast", fast)
+    try:
+        start = time.monotonic()
+        results = compare.compare_models(
+            ["blocking", "fast"], {"prompt": "x"}, concurrency=1, timeout=0.3, interval=0.01
+        )
+        elapsed = time.monotonic() - start
+    finally:
+        release.set()
+    assert elapsed < 2
+    assert [r.status for r in results] == ["timeout", "done"]
+    assert results[0].text == "partial "
+
+
+def test_concurrency_limit(backends):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def tracked(request):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        yield "ok"
+
+    for i in range(4):
+        backends(f"tracked-{i}", tracked)
+    results = compare.compare_models(
+        [f"tracked-{i}" for i in range(4)], {"prompt": "x"}, concurrency=2, interval=0.01
+    )
+    assert all(r.status == "done" for r in results)
+    assert max(peak) == 2
+
+
+def test_unknown_model():
+    with pytest.raises(KeyError):
+        compare.compare_models(["no-such-model"], {"prompt": "x"})
+
+
+def test_non_streaming_backend_has_no_ttft(backends):
+    def whole(request):
+        yield "complete answer"
+
+    whole.streams = False
+    backends("whole", whole)
+    record = compare.compare_models(["whole"], {"prompt": "x"}, interval=0.01)[0].to_dict()
+    assert record["status"] == "done"
+    assert record["ttft"] is None and record["latency"] is not None